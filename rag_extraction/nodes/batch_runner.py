@@ -0,0 +1,212 @@
+"""
+OpenAI Batch API runner for offline chunk processing
+"""
+import io
+import time
+
+import orjson
+from typing import Dict, List, Tuple
+from langsmith import traceable
+from openai import OpenAI
+
+from ..schemas.state import ExtractionState
+from . import entity_extractor, relationship_enhancer
+from .entity_extractor import active_entity_types, apply_extraction_results, build_extraction_messages
+from .relationship_enhancer import build_relationship_messages, validate_relationships
+
+# Terminal batch statuses per the OpenAI Batch API
+_TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+DEFAULT_POLL_INTERVAL = 30.0
+
+
+def _build_request(custom_id: str, messages: List[Dict], max_tokens: int, response_format: Dict) -> Dict:
+    """Build one /v1/chat/completions request line for the batch JSONL."""
+
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": messages,
+        "temperature": 0.1,
+        "max_tokens": max_tokens,
+        "response_format": response_format
+    }
+
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": body
+    }
+
+
+def _run_batch(
+    client: OpenAI, requests: List[Dict], poll_interval: float
+) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+    """Submit a batch, poll until it finishes, and return successful
+    response bodies and failed status codes, both keyed by custom_id."""
+
+    jsonl = b'\n'.join(orjson.dumps(request) for request in requests)
+    input_file = client.files.create(
+        file=io.BytesIO(jsonl),
+        purpose="batch"
+    )
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    while batch.status not in _TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != 'completed' or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+
+    output = client.files.content(batch.output_file_id).text
+
+    responses = {}
+    failures = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = orjson.loads(line)
+        status_code = result.get('response', {}).get('status_code')
+        if status_code == 200:
+            responses[result['custom_id']] = result['response']['body']
+        else:
+            failures[result['custom_id']] = status_code
+
+    return responses, failures
+
+
+def _response_content(response_body: Dict) -> str:
+    """Pull the message content out of a batch response body."""
+    return response_body['choices'][0]['message']['content']
+
+
+@traceable(name="run_extraction_batch")
+def run_extraction_batch(
+    states: List[ExtractionState],
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> List[ExtractionState]:
+    """
+    Extract entities for many chunks via the OpenAI Batch API.
+
+    Takes states that already hold chunk text (i.e. after retrieve_chunk),
+    runs one batched completion per processable chunk, and populates
+    extracted_entities in place. Processed states get batch_mode=True so the
+    extract_entities node becomes a no-op when the graph runs them.
+    """
+
+    client = OpenAI()
+
+    requests = []
+    entity_types_by_chunk = {}
+
+    for state in states:
+        if not state.get('should_process', True) or not state.get('chunk_text'):
+            continue
+        chunk_text = state.get('chunk_text_trimmed') or state['chunk_text']
+        entity_types = active_entity_types(chunk_text)
+        entity_types_by_chunk[state['chunk_id']] = entity_types
+        messages = build_extraction_messages(chunk_text, state.get('chunk_type'), entity_types)
+        requests.append(_build_request(state['chunk_id'], messages, max_tokens=4000,
+                                       response_format=entity_extractor.RESPONSE_FORMAT))
+
+    if not requests:
+        return states
+
+    responses, failures = _run_batch(client, requests, poll_interval)
+
+    for state in states:
+        chunk_id = state['chunk_id']
+        if chunk_id in failures:
+            state.setdefault('errors', []).append(
+                f"Batch extraction request failed with status {failures[chunk_id]}")
+            continue
+
+        response_body = responses.get(chunk_id)
+        if response_body is None:
+            continue
+
+        # One malformed response row must not discard the whole paid batch,
+        # so each state's demux failure lands in that state's errors
+        try:
+            results = orjson.loads(_response_content(response_body))
+            state.update(apply_extraction_results(state, entity_types_by_chunk[state['chunk_id']], results))
+            state['batch_mode'] = True
+        except Exception as e:
+            state.setdefault('errors', []).append(f"Error applying batch extraction response: {str(e)}")
+
+    return states
+
+
+@traceable(name="run_relationship_batch")
+def run_relationship_batch(
+    states: List[ExtractionState],
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> List[ExtractionState]:
+    """
+    Discover relationships for many chunks via the OpenAI Batch API.
+
+    Expects states with extracted_entities populated (e.g. by
+    run_extraction_batch). Populates entity_relationships in place so the
+    enhance_relationships node becomes a no-op.
+    """
+
+    client = OpenAI()
+
+    requests = []
+    entities_by_chunk = {}
+
+    for state in states:
+        if not state.get('should_process', True) or state.get('entity_count', 0) == 0:
+            continue
+
+        all_entities = []
+        for entity_type, entities in state.get('extracted_entities', {}).items():
+            for entity in entities:
+                all_entities.append(entity['name'])
+
+        if len(all_entities) < 2:
+            continue
+
+        if len(all_entities) > 10:
+            all_entities = all_entities[:10]
+
+        entities_by_chunk[state['chunk_id']] = all_entities
+        messages = build_relationship_messages(
+            all_entities, state.get('chunk_text_trimmed') or state['chunk_text'])
+        requests.append(_build_request(state['chunk_id'], messages, max_tokens=1000,
+                                       response_format=relationship_enhancer.RESPONSE_FORMAT))
+
+    if not requests:
+        return states
+
+    responses, failures = _run_batch(client, requests, poll_interval)
+
+    for state in states:
+        chunk_id = state['chunk_id']
+        if chunk_id in failures:
+            state.setdefault('errors', []).append(
+                f"Batch relationship request failed with status {failures[chunk_id]}")
+            continue
+
+        response_body = responses.get(chunk_id)
+        if response_body is None:
+            continue
+
+        # As above: demux failures stay per-state instead of aborting the batch
+        try:
+            relationships = orjson.loads(_response_content(response_body)).get('relationships', [])
+            state['entity_relationships'] = validate_relationships(
+                relationships, entities_by_chunk[state['chunk_id']]
+            )
+            state['relationship_count'] = len(state['entity_relationships'])
+            state['batch_mode'] = True
+        except Exception as e:
+            state.setdefault('errors', []).append(f"Error applying batch relationship response: {str(e)}")
+
+    return states
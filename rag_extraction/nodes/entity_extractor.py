@@ -1,282 +1,229 @@
 """
 Entity extractor node for LangGraph Cloud
 """
-import asyncio
+import re
 import time
-from typing import List, Dict
+from typing import Dict, List
+
 from langsmith import traceable
-from openai import AsyncOpenAI
+from openai.lib._pydantic import to_strict_json_schema
 
+from ..schemas.entities import EntityExtractionResponse
 from ..schemas.state import ExtractionState
-from ..schemas.entities import ExtractedEntity, EntityType
+from ..utils import llm_cache
+from ..utils.openai_client import parse_completion
 from ..utils.validators import validate_entity_name, validate_entity_definition
 
 
+# Cheap content prefilters - compiled once so each check is a single
+# C-level scan over the chunk, with no lowercased copy
+_MATH_RE = re.compile(r"[$=+\-*/^²³]")
+# Plain alternation (no word boundaries) keeps substring semantics, so
+# derived forms like "courts", "lawyer", "judgement" still match
+_LEGAL_RE = re.compile(r"court|law|rule|statute|precedent|jurisdiction|legal|judge", re.IGNORECASE)
+
+# Per-type extraction instructions, merged into the static system prompt
+ENTITY_SECTIONS = {
+    'concept': """- "concept": Key concepts. Focus on:
+  - Theories, principles, and methodologies
+  - Technical terms and domain-specific concepts
+  - Important ideas or frameworks
+  If unsure about a concept, don't extract it. Maximum 10 concepts.""",
+    'method': """- "method": Methods, procedures, and step-by-step processes. Look for:
+  - Analytical methods
+  - Procedures and workflows
+  - Systematic approaches
+  - Techniques and strategies
+  Maximum 5 methods.""",
+    'formula': """- "formula": Mathematical formulas and equations. Look for:
+  - Mathematical equations
+  - Statistical formulas
+  - Algorithmic expressions
+  NO single digits (1, 2, 3, etc.). Must contain mathematical operators or variables.
+  Include LaTeX notation if present. Provide mathematical context in definition.
+  Maximum 3 formulas.""",
+    'example': """- "example": Examples, case studies, and illustrative scenarios. Look for:
+  - Practical examples
+  - Case studies
+  - Scenarios and situations
+  - Illustrative instances
+  Complete example descriptions, no fragments. Maximum 5 examples.""",
+    'legal_principle': """- "legal_principle": Legal principles, rules, and doctrines. Look for:
+  - Legal rules and principles
+  - Court doctrines
+  - Statutory provisions
+  - Legal standards
+  Focus on established legal principles. Maximum 3 legal principles."""
+}
+
+
+# Static system prompt - byte-identical across all calls so provider-side
+# prompt caching applies to the instruction prefix. Per-chunk details
+# (entity types, chunk_type, text) go in the short user message.
+SYSTEM_PROMPT = f"""Extract entities from the text in the user message.
+
+Entity types:
+{chr(10).join(ENTITY_SECTIONS[entity_type] for entity_type in ENTITY_SECTIONS)}
+
+Rules:
+- Entity names must be complete phrases (minimum 3 characters)
+- No fragments starting with "ly", "ing", "ed", "er"
+- No single digits or mathematical symbols alone
+- Provide clear, relevant definitions
+
+The user message starts with the entity types to extract for this chunk and
+the chunk type, followed by the text. Only extract the requested types.
+
+Return a JSON object with one key per requested entity type, each holding an
+array of objects with 'name', 'definition', 'confidence' (0-1), 'domain'."""
+
+
+# Constrain the model to the response schema instead of free-form JSON.
+# strict mode enforces adherence server-side (as the live .parse() path
+# already gets), so batch responses can't drop required keys.
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "entity_extraction_response",
+        "strict": True,
+        "schema": to_strict_json_schema(EntityExtractionResponse)
+    }
+}
+
+
+def active_entity_types(chunk_text: str) -> List[str]:
+    """Determine which entity types are worth extracting from this chunk."""
+
+    entity_types = ['concept', 'method', 'example']
+
+    if _MATH_RE.search(chunk_text):
+        entity_types.append('formula')
+
+    if _LEGAL_RE.search(chunk_text):
+        entity_types.append('legal_principle')
+
+    return entity_types
+
+
+# Pre-built user message template, filled per call via format_map
+_USER_MESSAGE_TEMPLATE = "entity_types={entity_types}\nchunk_type={chunk_type}\n\n{chunk_text}"
+
+
+def build_extraction_messages(chunk_text: str, chunk_type: str, entity_types: List[str]) -> List[Dict]:
+    """Build the messages for one extraction call: static system prompt plus
+    a short user message carrying the per-chunk details."""
+
+    user_message = _USER_MESSAGE_TEMPLATE.format_map({
+        "entity_types": ', '.join(entity_types),
+        "chunk_type": chunk_type,
+        "chunk_text": chunk_text
+    })
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def apply_extraction_results(state: ExtractionState, entity_types: List[str], results: dict) -> ExtractionState:
+    """Validate parsed extraction results and build the state update."""
+
+    # Flatten to one (entity_type, entity) batch so validation runs as a
+    # single pass instead of nested per-type loops
+    batch = []
+    for entity_type in entity_types:
+        entities = results.get(entity_type, [])
+        if isinstance(entities, list):
+            batch.extend((entity_type, entity) for entity in entities)
+
+    validated = {}
+    warnings = list(state.get('warnings', []))
+
+    for entity_type, entity in batch:
+        name = entity['name']
+
+        # Validate entity name
+        is_valid_name, name_reason = validate_entity_name(name)
+        if not is_valid_name:
+            warnings.append(f"Invalid entity name '{name}': {name_reason}")
+            continue
+
+        # Validate definition if present
+        if entity.get('definition'):
+            is_valid_def, def_reason = validate_entity_definition(
+                entity['definition'], name
+            )
+            if not is_valid_def:
+                warnings.append(f"Invalid definition for '{name}': {def_reason}")
+                entity['definition'] = None
+
+        validated.setdefault(entity_type, []).append(entity)
+
+    extracted_entities = dict(state.get('extracted_entities', {}))
+    extracted_entities.update(validated)
+
+    return {
+        'extracted_entities': extracted_entities,
+        'entity_count': sum(len(entities) for entities in extracted_entities.values()),
+        'warnings': warnings
+    }
+
+
 @traceable(
-    name="extract_entities_node", 
+    name="extract_entities_node",
     metadata={"component": "entity-extraction"}
 )
 async def extract_entities(state: ExtractionState) -> ExtractionState:
     """
-    Extract entities from chunk text using specialized extractors.
+    Extract entities from chunk text with a single batched LLM call.
     """
-    
+
     start_time = time.time()
-    
+
     # Skip if chunk shouldn't be processed
-    if not state.should_process:
-        state.processing_time = time.time() - start_time
-        return state
-    
+    if not state.get('should_process', True):
+        return {'processing_time': time.time() - start_time}
+
+    # Skip if the batch runner already processed this chunk; batch_mode is
+    # only set after a response was applied, and a chunk with zero
+    # extracted entities is a valid outcome, not a reason to re-pay live
+    if state.get('batch_mode'):
+        return {}
+
     try:
-        # Initialize OpenAI client
-        client = AsyncOpenAI()
-        
-        # Run specialized extractors
-        extractors = {
-            'concept': extract_concepts,
-            'method': extract_methods,
-            'formula': extract_formulas,
-            'example': extract_examples,
-            'legal_principle': extract_legal_principles
-        }
-        
-        # Run extractors concurrently
-        tasks = []
-        for extractor_type, extractor_func in extractors.items():
-            task = extractor_func(client, state.chunk_text, state.chunk_type)
-            tasks.append((extractor_type, task))
-        
-        # Collect results
-        for extractor_type, task in tasks:
-            try:
-                entities = await task
-                validated_entities = []
-                
-                for entity in entities:
-                    # Validate entity name
-                    is_valid_name, name_reason = validate_entity_name(entity['name'])
-                    if not is_valid_name:
-                        state.warnings.append(f"Invalid entity name '{entity['name']}': {name_reason}")
-                        continue
-                    
-                    # Validate definition if present
-                    if entity.get('definition'):
-                        is_valid_def, def_reason = validate_entity_definition(
-                            entity['definition'], entity['name']
-                        )
-                        if not is_valid_def:
-                            state.warnings.append(f"Invalid definition for '{entity['name']}': {def_reason}")
-                            entity['definition'] = None
-                    
-                    validated_entities.append(entity)
-                
-                if validated_entities:
-                    state.extracted_entities[extractor_type] = validated_entities
-                    
-            except Exception as e:
-                state.errors.append(f"Error in {extractor_type} extractor: {str(e)}")
-        
-        # Update metrics
-        state.entity_count = sum(len(entities) for entities in state.extracted_entities.values())
-        state.processing_time = time.time() - start_time
-        
-        return state
-        
+        # One call covers all entity types present in the chunk, on the
+        # token-trimmed text prepared by retrieve_chunk
+        chunk_text = state.get('chunk_text_trimmed') or state.get('chunk_text') or ''
+        entity_types = active_entity_types(chunk_text)
+        messages = build_extraction_messages(chunk_text, state.get('chunk_type'), entity_types)
+
+        # Serve repeated prompts from the local response cache
+        key = llm_cache.cache_key("gpt-4o-mini", messages, 0.1,
+                                  response_format=RESPONSE_FORMAT)
+        content = llm_cache.get(key)
+
+        if content is not None:
+            parsed = EntityExtractionResponse.model_validate_json(content)
+        else:
+            response = await parse_completion(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.1,
+                max_tokens=4000,
+                response_format=EntityExtractionResponse
+            )
+            message = response.choices[0].message
+            parsed = message.parsed
+            llm_cache.set(key, message.content)
+
+        # Fan results back out by entity type with quality validation
+        update = apply_extraction_results(state, entity_types, parsed.model_dump())
+        update['processing_time'] = time.time() - start_time
+
+        return update
+
     except Exception as e:
-        state.errors.append(f"Error in entity extraction: {str(e)}")
-        state.processing_time = time.time() - start_time
-        return state
-
-
-@traceable(name="concept_extractor")
-async def extract_concepts(client: AsyncOpenAI, chunk_text: str, chunk_type: str) -> List[Dict]:
-    """Extract concepts with improved prompting and validation."""
-    
-    prompt = f"""
-    Extract key concepts from this {chunk_type} text. Focus on:
-    - Theories, principles, and methodologies
-    - Technical terms and domain-specific concepts
-    - Important ideas or frameworks
-    
-    Rules:
-    - Entity names must be complete phrases (minimum 3 characters)
-    - No fragments starting with "ly", "ing", "ed", "er"
-    - No single digits or mathematical symbols alone
-    - Provide clear, relevant definitions
-    - If unsure about a concept, don't extract it
-    
-    Text: {chunk_text}
-    
-    Return JSON array of objects with 'name', 'definition', 'confidence' (0-1), 'domain'.
-    Maximum 10 concepts.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=2000
-    )
-    
-    try:
-        import json
-        entities = json.loads(response.choices[0].message.content)
-        return entities if isinstance(entities, list) else []
-    except:
-        return []
-
-
-@traceable(name="method_extractor") 
-async def extract_methods(client: AsyncOpenAI, chunk_text: str, chunk_type: str) -> List[Dict]:
-    """Extract methods and procedures."""
-    
-    prompt = f"""
-    Extract methods, procedures, and step-by-step processes from this text.
-    Look for:
-    - Analytical methods
-    - Procedures and workflows
-    - Systematic approaches
-    - Techniques and strategies
-    
-    Rules: Complete names only, relevant definitions, confidence 0-1.
-    
-    Text: {chunk_text}
-    
-    JSON array format: [{{"name": "...", "definition": "...", "confidence": 0.8, "domain": "..."}}]
-    Maximum 5 methods.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=1500
-    )
-    
-    try:
-        import json
-        entities = json.loads(response.choices[0].message.content)
-        return entities if isinstance(entities, list) else []
-    except:
-        return []
-
-
-@traceable(name="formula_extractor")
-async def extract_formulas(client: AsyncOpenAI, chunk_text: str, chunk_type: str) -> List[Dict]:
-    """Extract mathematical formulas and equations."""
-    
-    # Skip if no mathematical content
-    if not any(indicator in chunk_text for indicator in ['$', '=', '+', '-', '*', '/', '^', '²', '³']):
-        return []
-    
-    prompt = f"""
-    Extract mathematical formulas and equations from this text.
-    Look for:
-    - Mathematical equations
-    - Statistical formulas
-    - Algorithmic expressions
-    
-    Rules:
-    - NO single digits (1, 2, 3, etc.)
-    - Must contain mathematical operators or variables
-    - Include LaTeX notation if present
-    - Provide mathematical context in definition
-    
-    Text: {chunk_text}
-    
-    JSON array format with mathematical formulas only.
-    Maximum 3 formulas.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=1000
-    )
-    
-    try:
-        import json
-        entities = json.loads(response.choices[0].message.content)
-        # Additional filter for single digits
-        filtered_entities = []
-        for entity in entities:
-            if not (entity['name'].isdigit() and len(entity['name']) <= 2):
-                filtered_entities.append(entity)
-        return filtered_entities
-    except:
-        return []
-
-
-@traceable(name="example_extractor")
-async def extract_examples(client: AsyncOpenAI, chunk_text: str, chunk_type: str) -> List[Dict]:
-    """Extract examples and case studies."""
-    
-    prompt = f"""
-    Extract examples, case studies, and illustrative scenarios from this text.
-    Look for:
-    - Practical examples
-    - Case studies
-    - Scenarios and situations
-    - Illustrative instances
-    
-    Rules: Complete example descriptions, no fragments.
-    
-    Text: {chunk_text}
-    
-    JSON array format. Maximum 5 examples.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=1500
-    )
-    
-    try:
-        import json
-        entities = json.loads(response.choices[0].message.content)
-        return entities if isinstance(entities, list) else []
-    except:
-        return []
-
-
-@traceable(name="legal_principle_extractor")
-async def extract_legal_principles(client: AsyncOpenAI, chunk_text: str, chunk_type: str) -> List[Dict]:
-    """Extract legal principles and rules."""
-    
-    # Skip if no legal content indicators
-    legal_indicators = ['court', 'law', 'rule', 'statute', 'precedent', 'jurisdiction', 'legal', 'judge']
-    if not any(indicator in chunk_text.lower() for indicator in legal_indicators):
-        return []
-    
-    prompt = f"""
-    Extract legal principles, rules, and doctrines from this text.
-    Look for:
-    - Legal rules and principles
-    - Court doctrines
-    - Statutory provisions
-    - Legal standards
-    
-    Rules: Focus on established legal principles.
-    
-    Text: {chunk_text}
-    
-    JSON array format. Maximum 3 legal principles.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=1000
-    )
-    
-    try:
-        import json
-        entities = json.loads(response.choices[0].message.content)
-        return entities if isinstance(entities, list) else []
-    except:
-        return []
\ No newline at end of file
+        return {
+            'errors': state.get('errors', []) + [f"Error in entity extraction: {str(e)}"],
+            'processing_time': time.time() - start_time
+        }
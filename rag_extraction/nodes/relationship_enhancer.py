@@ -2,11 +2,89 @@
 Relationship enhancer node for LangGraph Cloud
 """
 from typing import List, Dict
+
 from langsmith import traceable
-from openai import AsyncOpenAI
+from openai.lib._pydantic import to_strict_json_schema
+from pydantic import ValidationError
 
 from ..schemas.state import ExtractionState
-from ..schemas.entities import RelationshipType
+from ..schemas.entities import RelationshipExtractionResponse, RelationshipType
+from ..utils import llm_cache
+from ..utils.openai_client import parse_completion
+
+# Built once - validation does O(1) set lookups instead of list scans
+_VALID_REL_TYPES = frozenset(rt.value for rt in RelationshipType)
+
+
+# Static system prompt - byte-identical across calls so provider-side prompt
+# caching applies; the entity list and text context go in the user message.
+SYSTEM_PROMPT = """Analyze the relationships between the entities listed in the user message,
+based on the text context that follows them.
+
+Find direct relationships where one entity relates to another based on the text.
+
+Relationship types to consider:
+- RELATED_TO: General conceptual relationship
+- PREREQUISITE_OF: One concept is needed to understand another
+- PART_OF: One is a component of another
+- USES: One concept uses or applies another
+- SIMILAR_TO: Concepts are similar or analogous
+- APPLIED_IN: One concept is applied in the context of another
+
+Return a JSON object with a "relationships" array:
+{"relationships": [{
+    "source_entity": "exact entity name",
+    "target_entity": "exact entity name",
+    "relationship_type": "RELATIONSHIP_TYPE",
+    "confidence": 0.8,
+    "description": "brief explanation of the relationship"
+}]}
+
+Only return relationships that are clearly supported by the text.
+Maximum 5 relationships."""
+
+# Constrain the model to the response schema instead of free-form JSON.
+# strict mode enforces adherence server-side, matching the live .parse() path.
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "relationship_extraction_response",
+        "strict": True,
+        "schema": to_strict_json_schema(RelationshipExtractionResponse)
+    }
+}
+
+
+# Pre-built user message template, filled per call via format_map
+_USER_MESSAGE_TEMPLATE = "Entities: {entity_list}\n\nText context: {context}..."
+
+
+def build_relationship_messages(entities: List[str], chunk_text: str) -> List[Dict]:
+    """Build the messages for one relationship discovery call."""
+
+    user_message = _USER_MESSAGE_TEMPLATE.format_map({
+        "entity_list": ', '.join(f'"{entity}"' for entity in entities),
+        "context": chunk_text[:1500]
+    })
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def validate_relationships(relationships: List[Dict], entities: List[str]) -> List[Dict]:
+    """Keep only relationships between known entities with valid types."""
+
+    entities_set = frozenset(entities)
+
+    return [
+        rel for rel in relationships
+        if (rel.get('source_entity') in entities_set and
+            rel.get('target_entity') in entities_set and
+            rel.get('relationship_type') in _VALID_REL_TYPES and
+            rel.get('source_entity') != rel.get('target_entity'))
+    ]
 
 
 @traceable(
@@ -17,107 +95,79 @@ async def enhance_relationships(state: ExtractionState) -> ExtractionState:
     """
     Discover relationships between extracted entities.
     """
-    
+
     # Skip if no entities or chunk wasn't processed
-    if not state.should_process or state.entity_count == 0:
-        return state
-    
+    if not state.get('should_process', True) or state.get('entity_count', 0) == 0:
+        return {}
+
+    # Skip if the batch runner already processed this chunk; finding zero
+    # relationships is a valid batch outcome, not a reason to re-pay live
+    if state.get('batch_mode'):
+        return {}
+
     # Get all entity names
     all_entities = []
-    for entity_type, entities in state.extracted_entities.items():
+    for entity_type, entities in state.get('extracted_entities', {}).items():
         for entity in entities:
             all_entities.append(entity['name'])
-    
+
     # Skip if too few entities for relationships
     if len(all_entities) < 2:
-        return state
-    
+        return {}
+
     try:
-        # Initialize OpenAI client
-        client = AsyncOpenAI()
-        
-        # Find relationships between entities
+        # Find relationships between entities, on the token-trimmed text
         relationships = await find_entity_relationships(
-            client, all_entities, state.chunk_text
+            all_entities, state.get('chunk_text_trimmed') or state.get('chunk_text') or ''
         )
-        
-        state.entity_relationships = relationships
-        state.relationship_count = len(relationships)
-        
-        return state
-        
+
+        return {
+            'entity_relationships': relationships,
+            'relationship_count': len(relationships)
+        }
+
     except Exception as e:
-        state.errors.append(f"Error in relationship enhancement: {str(e)}")
-        return state
+        return {'errors': state.get('errors', []) + [f"Error in relationship enhancement: {str(e)}"]}
 
 
 @traceable(name="find_entity_relationships")
 async def find_entity_relationships(
-    client: AsyncOpenAI, 
-    entities: List[str], 
+    entities: List[str],
     chunk_text: str
 ) -> List[Dict]:
     """Find relationships between entities in the chunk."""
-    
+
     if len(entities) < 2:
         return []
-    
+
     # Limit to avoid overwhelming the LLM
     if len(entities) > 10:
         entities = entities[:10]
-    
-    prompt = f"""
-    Analyze the relationships between these entities found in the text:
-    {', '.join(f'"{entity}"' for entity in entities)}
-    
-    Text context: {chunk_text[:1500]}...
-    
-    Find direct relationships where one entity relates to another based on the text.
-    
-    Relationship types to consider:
-    - RELATED_TO: General conceptual relationship
-    - PREREQUISITE_OF: One concept is needed to understand another
-    - PART_OF: One is a component of another
-    - USES: One concept uses or applies another
-    - SIMILAR_TO: Concepts are similar or analogous
-    - APPLIED_IN: One concept is applied in the context of another
-    
-    Return JSON array of relationships:
-    [{{
-        "source_entity": "exact entity name",
-        "target_entity": "exact entity name", 
-        "relationship_type": "RELATIONSHIP_TYPE",
-        "confidence": 0.8,
-        "description": "brief explanation of the relationship"
-    }}]
-    
-    Only return relationships that are clearly supported by the text.
-    Maximum 5 relationships.
-    """
-    
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=1000
-    )
-    
+
+    messages = build_relationship_messages(entities, chunk_text)
+
+    # Serve repeated prompts from the local response cache
+    key = llm_cache.cache_key("gpt-4o-mini", messages, 0.1,
+                              response_format=RESPONSE_FORMAT)
+    content = llm_cache.get(key)
+
     try:
-        import json
-        relationships = json.loads(response.choices[0].message.content)
-        
-        # Validate relationships
-        valid_relationships = []
-        valid_rel_types = [rt.value for rt in RelationshipType]
-        
-        for rel in relationships:
-            if (rel.get('source_entity') in entities and 
-                rel.get('target_entity') in entities and
-                rel.get('relationship_type') in valid_rel_types and
-                rel.get('source_entity') != rel.get('target_entity')):
-                valid_relationships.append(rel)
-        
-        return valid_relationships
-        
-    except Exception:
-        return []
\ No newline at end of file
+        if content is not None:
+            parsed = RelationshipExtractionResponse.model_validate_json(content)
+        else:
+            response = await parse_completion(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.1,
+                max_tokens=1000,
+                response_format=RelationshipExtractionResponse
+            )
+            message = response.choices[0].message
+            parsed = message.parsed
+            llm_cache.set(key, message.content)
+
+    except ValidationError:
+        return []
+
+    relationships = parsed.model_dump(mode='json')['relationships']
+    return validate_relationships(relationships, entities)
@@ -11,41 +11,57 @@ from ..utils.neo4j_client import Neo4jClient
     name="store_results_node",
     metadata={"component": "storage"}
 )
-def store_results(state: ExtractionState) -> ExtractionState:
+async def store_results(state: ExtractionState) -> ExtractionState:
     """
     Store validated entities and relationships in Neo4j.
     """
     
     # Skip if chunk wasn't processed or no entities
-    if not state.should_process or state.entity_count == 0:
-        return state
-    
+    if not state.get('should_process', True) or state.get('entity_count', 0) == 0:
+        return {}
+
     # Get Neo4j client
     client = Neo4jClient()
-    
+
+    warnings = []
+
     try:
-        # Flatten entities for storage
+        # Flatten entities for storage, remembering each name's node label
         all_entities = []
-        for entity_type, entities in state.extracted_entities.items():
+        label_by_name = {}
+        for entity_type, entities in state.get('extracted_entities', {}).items():
             for entity in entities:
                 entity['entity_type'] = entity_type
                 all_entities.append(entity)
-        
+                label_by_name[entity['name']] = entity_type.title()
+
+        # Attach labels so relationship writes hit the name index directly
+        relationships = []
+        for rel in state.get('entity_relationships', []):
+            source_label = label_by_name.get(rel['source_entity'])
+            target_label = label_by_name.get(rel['target_entity'])
+            if not source_label or not target_label:
+                warnings.append(
+                    f"Skipping relationship with unknown entities: "
+                    f"{rel['source_entity']} -> {rel['target_entity']}"
+                )
+                continue
+            relationships.append(dict(rel, source_label=source_label, target_label=target_label))
+
         # Store in Neo4j
-        client.store_entities(
-            chunk_id=state.chunk_id,
+        await client.store_entities(
+            chunk_id=state['chunk_id'],
             entities=all_entities,
-            relationships=state.entity_relationships
+            relationships=relationships
         )
-        
+
         # Log successful storage
-        state.warnings.append(f"Stored {len(all_entities)} entities and {len(state.entity_relationships)} relationships")
-        
-        return state
-        
+        warnings.append(f"Stored {len(all_entities)} entities and {len(relationships)} relationships")
+
+        return {'warnings': state.get('warnings', []) + warnings}
+
     except Exception as e:
-        state.errors.append(f"Error storing results: {str(e)}")
-        return state
-        
-    finally:
-        client.close()
\ No newline at end of file
+        update: ExtractionState = {'errors': state.get('errors', []) + [f"Error storing results: {str(e)}"]}
+        if warnings:
+            update['warnings'] = state.get('warnings', []) + warnings
+        return update
\ No newline at end of file
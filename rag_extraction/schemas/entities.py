@@ -1,7 +1,7 @@
 """
 Entity and relationship schemas
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -37,6 +37,23 @@ class ExtractedEntity(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata")
 
 
+class EntityRecord(BaseModel):
+    """Schema for one entity as returned by the extraction LLM"""
+    name: str = Field(description="Name/title of the entity")
+    definition: Optional[str] = Field(default=None, description="Definition or description")
+    confidence: float = Field(default=0.8, description="Confidence score (0-1)")
+    domain: str = Field(default="general", description="Domain/subject area")
+
+
+class EntityExtractionResponse(BaseModel):
+    """Schema for the batched extraction response, keyed by entity type"""
+    concept: List[EntityRecord] = Field(default_factory=list)
+    method: List[EntityRecord] = Field(default_factory=list)
+    formula: List[EntityRecord] = Field(default_factory=list)
+    example: List[EntityRecord] = Field(default_factory=list)
+    legal_principle: List[EntityRecord] = Field(default_factory=list)
+
+
 class ExtractedRelationship(BaseModel):
     """Schema for relationships between entities"""
     source_entity: str = Field(description="Name of source entity")
@@ -44,4 +61,18 @@ class ExtractedRelationship(BaseModel):
     relationship_type: RelationshipType = Field(description="Type of relationship")
     confidence: float = Field(default=0.8, description="Confidence score (0-1)")
     description: Optional[str] = Field(default=None, description="Description of relationship")
-    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata")
\ No newline at end of file
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata")
+
+
+class RelationshipRecord(BaseModel):
+    """Schema for one relationship as returned by the discovery LLM"""
+    source_entity: str = Field(description="Name of source entity")
+    target_entity: str = Field(description="Name of target entity")
+    relationship_type: RelationshipType = Field(description="Type of relationship")
+    confidence: float = Field(default=0.8, description="Confidence score (0-1)")
+    description: Optional[str] = Field(default=None, description="Description of relationship")
+
+
+class RelationshipExtractionResponse(BaseModel):
+    """Schema for the relationship discovery response"""
+    relationships: List[RelationshipRecord] = Field(default_factory=list)
@@ -1,43 +1,39 @@
 """
 Extraction State for LangGraph Cloud Deployment
 """
-from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Any, Optional, TypedDict
 
 
-class ExtractionState(BaseModel):
-    """State for semantic extraction workflow."""
-    
+class ExtractionState(TypedDict, total=False):
+    """State for semantic extraction workflow.
+
+    Plain TypedDict so state access is dict access with no per-assignment
+    validation overhead; nodes return partial updates that LangGraph merges.
+    """
+
     # Input
-    chunk_id: str = Field(description="Unique identifier for the chunk to process")
-    
+    chunk_id: str
+
     # Retrieved data
-    chunk_text: Optional[str] = Field(default=None, description="Text content of the chunk")
-    chunk_metadata: Optional[Dict[str, Any]] = Field(default=None, description="Metadata about the chunk")
-    chunk_type: Optional[str] = Field(default=None, description="Type of chunk (paragraph, section, etc.)")
-    
+    chunk_text: Optional[str]
+    chunk_text_trimmed: Optional[str]
+    chunk_metadata: Optional[Dict[str, Any]]
+    chunk_type: Optional[str]
+
     # Extraction results
-    extracted_entities: Dict[str, List[Dict]] = Field(
-        default_factory=dict, 
-        description="Extracted entities by type"
-    )
-    entity_relationships: List[Dict] = Field(
-        default_factory=list, 
-        description="Relationships between entities"
-    )
-    
+    extracted_entities: Dict[str, List[Dict]]
+    entity_relationships: List[Dict]
+
     # Processing metadata
-    processing_time: float = Field(default=0.0, description="Time taken to process")
-    errors: List[str] = Field(default_factory=list, description="Any processing errors")
-    warnings: List[str] = Field(default_factory=list, description="Any processing warnings")
-    
+    processing_time: float
+    errors: List[str]
+    warnings: List[str]
+
     # Quality metrics
-    entity_count: int = Field(default=0, description="Total number of entities extracted")
-    relationship_count: int = Field(default=0, description="Total number of relationships found")
-    
+    entity_count: int
+    relationship_count: int
+
     # Processing flags
-    should_process: bool = Field(default=True, description="Whether chunk should be processed")
-    skip_reason: Optional[str] = Field(default=None, description="Reason for skipping if applicable")
-    
-    class Config:
-        arbitrary_types_allowed = True
\ No newline at end of file
+    should_process: bool
+    skip_reason: Optional[str]
+    batch_mode: bool
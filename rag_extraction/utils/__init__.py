@@ -4,5 +4,6 @@ Utility functions for RAG extraction
 
 from .validators import should_process_chunk, validate_entity_name
 from .neo4j_client import Neo4jClient
+from .openai_client import get_openai_client
 
-__all__ = ["should_process_chunk", "validate_entity_name", "Neo4jClient"]
\ No newline at end of file
+__all__ = ["should_process_chunk", "validate_entity_name", "Neo4jClient", "get_openai_client"]
\ No newline at end of file
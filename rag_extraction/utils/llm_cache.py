@@ -0,0 +1,84 @@
+"""
+SHA-256-keyed local cache for LLM responses
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Re-running the same corpus (debugging, retries, A/B evals) repeats identical
+# prompts; caching the raw response text makes those runs near-instant and free.
+
+_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '.llm_cache.sqlite')
+_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+
+_CONN = None
+_LOCK = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """Whether the response cache is active (disable with LLM_CACHE_DISABLED=1)."""
+    return os.getenv('LLM_CACHE_DISABLED') != '1'
+
+
+def cache_key(model: str, messages: List[Dict], temperature: float,
+              response_format: Optional[Dict] = None) -> str:
+    """Build a stable SHA-256 key for one completion request.
+
+    The response format (including its JSON schema) is part of the key,
+    so responses cached under an older schema miss instead of failing
+    validation when the schema evolves."""
+    payload = (f"{model}|{temperature}|{json.dumps(messages, sort_keys=True)}"
+               f"|{json.dumps(response_format, sort_keys=True)}")
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(_CACHE_PATH, check_same_thread=False)
+        _CONN.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, response TEXT, created_at INTEGER)"
+        )
+        _CONN.commit()
+    return _CONN
+
+
+def get(key: str) -> Optional[str]:
+    """Get a cached response, or None on miss/expiry/disabled cache."""
+
+    if not cache_enabled():
+        return None
+
+    with _LOCK:
+        row = _get_conn().execute(
+            "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    response, created_at = row
+    if time.time() - created_at > _CACHE_TTL:
+        return None
+
+    return response
+
+
+def set(key: str, response: str) -> None:
+    """Store a response under its key."""
+
+    if not cache_enabled():
+        return
+
+    with _LOCK:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, int(time.time()))
+        )
+        conn.commit()
@@ -1,78 +1,173 @@
 """
 Neo4j client for LangGraph Cloud deployment
 """
+import asyncio
+import atexit
 import os
 from typing import Dict, List, Any, Optional
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
 
+# Shared driver - opening a Bolt driver is expensive, so one connection pool
+# serves all node invocations for the lifetime of the process
+_DRIVER = None
 
-class Neo4jClient:
-    """Neo4j client for cloud deployment"""
-    
-    def __init__(self):
-        self.driver = GraphDatabase.driver(
+# Entity labels as written by store_entities (entity_type.title())
+_ENTITY_LABELS = ('Concept', 'Method', 'Formula', 'Question', 'Example',
+                  'Legal_Principle', 'Case_Citation')
+
+# Guard so constraints are created at most once per process
+_SCHEMA_READY = False
+
+
+def get_driver():
+    """Get the shared async Neo4j driver, creating it on first use."""
+    global _DRIVER
+    if _DRIVER is None:
+        _DRIVER = AsyncGraphDatabase.driver(
             os.getenv('NEO4J_URI'),
-            auth=(os.getenv('NEO4J_USER'), os.getenv('NEO4J_PASSWORD'))
+            auth=(os.getenv('NEO4J_USER'), os.getenv('NEO4J_PASSWORD')),
+            max_connection_pool_size=int(os.getenv('NEO4J_POOL_SIZE', '50')),
+            connection_acquisition_timeout=60,
+            max_connection_lifetime=3600,
+            keep_alive=True,
+            notifications_min_severity='OFF'
         )
-    
-    def get_chunk_data(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        atexit.register(_close_driver)
+    return _DRIVER
+
+
+def _close_driver():
+    """Best-effort close of the shared driver at interpreter exit."""
+    if _DRIVER is not None:
+        try:
+            asyncio.run(_DRIVER.close())
+        except RuntimeError:
+            pass
+
+
+class Neo4jClient:
+    """Neo4j client for cloud deployment, backed by the shared async driver"""
+
+    def __init__(self):
+        self.driver = get_driver()
+        # Pinning the database skips per-session home-db discovery
+        self.database = os.getenv('NEO4J_DB', 'neo4j')
+
+    async def ensure_schema(self) -> None:
+        """Create uniqueness constraints once so MERGE uses an index lookup
+        instead of scanning every node with the label."""
+
+        global _SCHEMA_READY
+        if _SCHEMA_READY:
+            return
+
+        async with self.driver.session(database=self.database) as session:
+            for label in _ENTITY_LABELS:
+                await session.execute_write(
+                    self._run_query,
+                    f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.name IS UNIQUE",
+                    {}
+                )
+            await session.execute_write(
+                self._run_query,
+                "CREATE CONSTRAINT IF NOT EXISTS FOR (c:SemanticChunk) REQUIRE c.id IS UNIQUE",
+                {}
+            )
+
+        _SCHEMA_READY = True
+
+    async def get_chunk_data(self, chunk_id: str) -> Optional[Dict[str, Any]]:
         """Get chunk data from Neo4j"""
-        with self.driver.session() as session:
-            query = """
-            MATCH (c:SemanticChunk {id: $chunk_id})
-            RETURN c.text as text,
-                   c.semantic_type as chunk_type,
-                   c.token_count as token_count,
-                   c.book_id as book_id,
-                   c.position as position
-            """
-            result = session.run(query, chunk_id=chunk_id)
-            record = result.single()
+        query = """
+        MATCH (c:SemanticChunk {id: $chunk_id})
+        RETURN c.text as text,
+               c.semantic_type as chunk_type,
+               c.token_count as token_count,
+               c.book_id as book_id,
+               c.position as position
+        """
+
+        async def _read(tx):
+            result = await tx.run(query, chunk_id=chunk_id)
+            record = await result.single()
             return dict(record) if record else None
-    
-    def store_entities(self, chunk_id: str, entities: List[Dict], relationships: List[Dict]) -> None:
-        """Store extracted entities and relationships"""
-        with self.driver.session() as session:
-            # Store entities
-            for entity in entities:
+
+        # execute_read lets the driver route to a read replica in a cluster
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_read(_read)
+
+    async def store_entities(self, chunk_id: str, entities: List[Dict], relationships: List[Dict]) -> None:
+        """Store extracted entities and relationships with batched UNWIND writes"""
+
+        await self.ensure_schema()
+
+        # Labels travel as row data so one cached query plan serves all types
+        entity_rows = []
+        for entity in entities:
+            entity_rows.append({
+                'label': entity['entity_type'].title(),
+                'rel_type': self._get_relationship_type(entity['entity_type']),
+                'name': entity['name'],
+                'props': {
+                    'definition': entity.get('definition'),
+                    'confidence': entity.get('confidence', 0.8),
+                    'domain': entity.get('domain', 'general')
+                }
+            })
+
+        # Relationship endpoints carry their labels so lookups are indexed
+        rel_rows = []
+        for rel in relationships:
+            rel_rows.append({
+                'source_label': rel['source_label'],
+                'target_label': rel['target_label'],
+                'source_name': rel['source_entity'],
+                'target_name': rel['target_entity'],
+                'rel_type': rel['relationship_type'],
+                'confidence': rel.get('confidence', 0.8),
+                'description': rel.get('description')
+            })
+
+        async with self.driver.session(database=self.database) as session:
+            # One write transaction covers every entity, via APOC so the
+            # label and relationship type are parameters, not query text
+            if entity_rows:
                 entity_query = """
                 MATCH (c:SemanticChunk {id: $chunk_id})
-                MERGE (e:{entity_type} {name: $name})
-                SET e.definition = $definition,
-                    e.confidence = $confidence,
-                    e.domain = $domain,
-                    e.created_at = datetime()
-                MERGE (c)<-[r:{relationship}]-(e)
-                SET r.created_at = datetime()
-                """.format(
-                    entity_type=entity['entity_type'].title(),
-                    relationship=self._get_relationship_type(entity['entity_type'])
-                )
-                
-                session.run(entity_query, 
-                           chunk_id=chunk_id,
-                           name=entity['name'],
-                           definition=entity.get('definition'),
-                           confidence=entity.get('confidence', 0.8),
-                           domain=entity.get('domain', 'general'))
-            
-            # Store relationships
-            for rel in relationships:
+                UNWIND $rows AS row
+                CALL apoc.merge.node([row.label], {name: row.name}) YIELD node
+                SET node += row.props,
+                    node.created_at = datetime()
+                CALL apoc.merge.relationship(node, row.rel_type, {}, {created_at: datetime()}, c)
+                YIELD rel
+                RETURN count(*)
+                """
+
+                await session.execute_write(self._run_query, entity_query,
+                                            {'chunk_id': chunk_id, 'rows': entity_rows})
+
+            # One write transaction covers every relationship, with labeled
+            # endpoint lookups instead of all-node property scans
+            if rel_rows:
                 rel_query = """
-                MATCH (source {name: $source_name})
-                MATCH (target {name: $target_name})
-                MERGE (source)-[r:{rel_type}]->(target)
-                SET r.confidence = $confidence,
-                    r.description = $description,
-                    r.created_at = datetime()
-                """.format(rel_type=rel['relationship_type'])
-                
-                session.run(rel_query,
-                           source_name=rel['source_entity'],
-                           target_name=rel['target_entity'],
-                           confidence=rel.get('confidence', 0.8),
-                           description=rel.get('description'))
-    
+                UNWIND $rows AS row
+                CALL apoc.merge.node([row.source_label], {name: row.source_name}) YIELD node AS source
+                CALL apoc.merge.node([row.target_label], {name: row.target_name}) YIELD node AS target
+                CALL apoc.merge.relationship(source, row.rel_type, {},
+                    {confidence: row.confidence, description: row.description, created_at: datetime()},
+                    target,
+                    {confidence: row.confidence, description: row.description})
+                YIELD rel
+                RETURN count(*)
+                """
+
+                await session.execute_write(self._run_query, rel_query, {'rows': rel_rows})
+
+    @staticmethod
+    async def _run_query(tx, query: str, parameters: Dict[str, Any]):
+        """Transaction function for execute_write/execute_read"""
+        return await tx.run(query, **parameters)
+
     def _get_relationship_type(self, entity_type: str) -> str:
         """Get appropriate relationship type for entity"""
         mapping = {
@@ -85,7 +180,3 @@ class Neo4jClient:
             'case_citation': 'CITED_IN'
         }
         return mapping.get(entity_type.lower(), 'APPEARS_IN')
-    
-    def close(self):
-        """Close the Neo4j connection"""
-        self.driver.close()
\ No newline at end of file
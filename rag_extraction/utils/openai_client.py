@@ -0,0 +1,64 @@
+"""
+Shared OpenAI client for LangGraph Cloud deployment
+"""
+import asyncio
+import os
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# Shared client - reusing one httpx pool avoids per-call TCP/TLS setup
+_CLIENT = None
+
+# Global cap on in-flight completions so graph-level concurrency can't
+# burst past the account rate limit
+_LLM_SEM = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared AsyncOpenAI client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = AsyncOpenAI(
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+        )
+    return _CLIENT
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _LLM_SEM
+    if _LLM_SEM is None:
+        _LLM_SEM = asyncio.Semaphore(int(os.getenv('OPENAI_MAX_CONCURRENCY', '16')))
+    return _LLM_SEM
+
+
+@retry(
+    retry=retry_if_exception_type(openai.RateLimitError),
+    wait=wait_random_exponential(min=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True
+)
+async def chat_completion(**kwargs):
+    """Run one chat completion under the global concurrency cap, retrying
+    rate-limit errors with exponential backoff."""
+    client = get_openai_client()
+    async with _get_semaphore():
+        return await client.chat.completions.create(**kwargs)
+
+
+@retry(
+    retry=retry_if_exception_type(openai.RateLimitError),
+    wait=wait_random_exponential(min=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True
+)
+async def parse_completion(**kwargs):
+    """Like chat_completion, but for structured outputs parsed into a
+    pydantic model (response_format=<BaseModel subclass>)."""
+    client = get_openai_client()
+    async with _get_semaphore():
+        return await client.beta.chat.completions.parse(**kwargs)
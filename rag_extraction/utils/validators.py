@@ -2,7 +2,74 @@
 Input validation for chunk processing and entity quality
 """
 import re
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple
+
+# Truncated-name prefixes (common extraction errors): fragments like
+# "ly to perceive...", "ing something...", "ed in the...", "er than...",
+# "and the...", "the method...". Checked against the lowered name with a
+# single C-level str.startswith(tuple); names containing an ellipsis are
+# caught by a plain substring test.
+_TRUNC_PREFIXES = ('ly ', 'ing ', 'ed ', 'er ', 'and ', 'the ')
+
+# Table-of-contents and navigation markers, pre-lowered once
+_NAV_PATTERNS = (
+    '# Table of Contents', '## Page', 'Click here', 'See page',
+    'Page ', '...', '##', 'Chapter ', 'Section '
+)
+_NAV_LOWER = tuple(pattern.lower() for pattern in _NAV_PATTERNS)
+
+# Content-rich chunk types worth extracting from
+_CONTENT_TYPES = frozenset({'paragraph', 'section', 'subsection'})
+
+# Common OCR artifacts: single characters tested via set intersection,
+# plus the multi-char '$$' which still needs a substring check
+_OCR_SINGLE_CHARS = frozenset('{}^_\\`')
+
+# Common meaningless phrases, pre-lowered once at import
+_MEANINGLESS_NAMES = (
+    "click here", "see page", "page ", "chapter ", "section ",
+    "figure ", "table ", "appendix ", "index", "bibliography"
+)
+_MEANINGLESS_DEFS = (
+    "definition not provided", "see above", "as mentioned",
+    "refers to", "unknown", "n/a"
+)
+
+# Single alternations so each meaningless-phrase scan is one engine pass
+# over the raw string, with no lowered copy needed
+_MEANINGLESS_NAME_RE = re.compile('|'.join(map(re.escape, _MEANINGLESS_NAMES)), re.IGNORECASE)
+_MEANINGLESS_DEF_RE = re.compile('|'.join(map(re.escape, _MEANINGLESS_DEFS)), re.IGNORECASE)
+
+# Deletes every non-alphabetic ASCII character, so counting alphabetic
+# characters in an ASCII name is a single C-level translate
+_NON_ALPHA_ASCII = str.maketrans(
+    '', '', ''.join(chr(i) for i in range(128) if not chr(i).isalpha())
+)
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+if ahocorasick is not None:
+    # One automaton pass finds any navigation pattern in linear time
+    _NAV_AC = ahocorasick.Automaton()
+    for _pattern in _NAV_LOWER:
+        _NAV_AC.add_word(_pattern, _pattern)
+    _NAV_AC.make_automaton()
+
+    def _has_navigation(text_lower: str) -> bool:
+        """Check lowered text for any navigation pattern."""
+        return next(_NAV_AC.iter(text_lower), None) is not None
+else:
+    # Fallback: a single compiled alternation, still one C-level scan
+    _NAV_RE = re.compile('|'.join(map(re.escape, _NAV_LOWER)))
+
+    def _has_navigation(text_lower: str) -> bool:
+        """Check lowered text for any navigation pattern."""
+        return _NAV_RE.search(text_lower) is not None
 
 
 def should_process_chunk(chunk_text: str, chunk_type: str) -> Tuple[bool, str]:
@@ -13,107 +80,190 @@ def should_process_chunk(chunk_text: str, chunk_type: str) -> Tuple[bool, str]:
         Tuple of (should_process, reason_if_not)
     """
     
+    stripped = chunk_text.strip()
+
     # Skip very short chunks
-    if len(chunk_text.strip()) < 50:
+    if len(stripped) < 50:
         return False, "chunk_too_short"
         
+    # One pass over the lines gathers everything the line-based gates need:
+    # line count (image-only), stripped-line uniqueness (repetition), and
+    # non-navigation content length (navigation). Per-line lowering only
+    # happens when the chunk contains a navigation pattern at all.
+    lines = chunk_text.split('\n')
+    has_nav = _has_navigation(chunk_text.lower())
+    unique_lines = set()
+    non_nav_len = 0
+    for line in lines:
+        stripped_line = line.strip()
+        if not stripped_line:
+            continue
+        unique_lines.add(stripped_line)
+        if has_nav and not _has_navigation(stripped_line.lower()):
+            non_nav_len += len(stripped_line) + 1  # +1 for the joining space
+
     # Skip image-only chunks
-    if chunk_text.strip().startswith('![') and chunk_text.count('\n') < 2:
+    if stripped.startswith('![') and len(lines) - 1 < 2:
         return False, "image_only_chunk"
-        
-    # Skip table of contents and navigation
-    navigation_patterns = [
-        '# Table of Contents', '## Page', 'Click here', 'See page',
-        'Page ', '...', '##', 'Chapter ', 'Section '
-    ]
-    
-    text_lower = chunk_text.lower()
-    if any(pattern.lower() in text_lower for pattern in navigation_patterns):
-        # Allow if chunk has substantial content beyond navigation
-        content_lines = [line.strip() for line in chunk_text.split('\n') if line.strip()]
-        non_nav_lines = [line for line in content_lines 
-                        if not any(nav.lower() in line.lower() for nav in navigation_patterns)]
-        
-        if len(' '.join(non_nav_lines)) < 100:
-            return False, "navigation_only"
-    
+
+    # Skip table of contents and navigation, unless the chunk has
+    # substantial content beyond it
+    if has_nav and non_nav_len - 1 < 100:
+        return False, "navigation_only"
+
     # Skip very repetitive content
-    lines = chunk_text.split('\n')
-    if len(lines) > 5:
-        unique_lines = set(line.strip() for line in lines if line.strip())
-        if len(unique_lines) / len(lines) < 0.3:  # Less than 30% unique lines
-            return False, "repetitive_content"
+    if len(lines) > 5 and len(unique_lines) / len(lines) < 0.3:  # Less than 30% unique lines
+        return False, "repetitive_content"
     
     # Focus on content-rich chunk types
-    content_types = ['paragraph', 'section', 'subsection']
-    if chunk_type and chunk_type not in content_types:
+    if chunk_type and chunk_type not in _CONTENT_TYPES:
         # Allow if chunk has substantial content despite type
-        if len(chunk_text.strip()) < 200:
+        if len(stripped) < 200:
             return False, f"non_content_type_{chunk_type}"
     
     # Skip chunks that are mostly formulas/math without context
-    if chunk_text.count('$') > 10 and len(chunk_text.replace('$', '').strip()) < 50:
+    dollar_count = chunk_text.count('$')
+    if dollar_count > 10 and len(stripped) - dollar_count < 50:
         return False, "formula_only"
         
     return True, ""
 
 
-def validate_entity_name(name: str) -> Tuple[bool, str]:
+def prefilter_chunks(chunks: List[str]) -> List[bool]:
     """
-    Validate extracted entity names for quality.
-    
-    Returns:
-        Tuple of (is_valid, reason_if_invalid)
+    Cheap batch prefilter over raw chunk texts.
+
+    Applies only the numeric gates from should_process_chunk (length,
+    dollar-sign density, line uniqueness), all of which run as C-level
+    str operations. Returns a maybe-process mask: a False entry would
+    also fail should_process_chunk, while a True entry still needs the
+    full per-chunk check. Useful to thin out large corpora before the
+    heavier navigation scanning.
     """
-    
-    name = name.strip()
-    
-    # Reject empty or very short names
-    if len(name) < 3:
-        return False, "too_short"
-        
-    # Reject truncated names (common extraction errors)
-    truncation_patterns = [
-        r'^ly\s+',  # "ly to perceive..."
-        r'^ing\s+', # "ing something..."
-        r'^ed\s+',  # "ed in the..."
-        r'^er\s+',  # "er than..."
-        r'^and\s+', # "and the..."
-        r'^the\s+', # "the method..." (if very short)
-        r'\.\.\.', # Contains ellipsis
-    ]
-    
-    for pattern in truncation_patterns:
-        if re.search(pattern, name, re.IGNORECASE):
+
+    mask = []
+    for chunk_text in chunks:
+        stripped = chunk_text.strip()
+
+        if len(stripped) < 50:
+            mask.append(False)
+            continue
+
+        dollar_count = chunk_text.count('$')
+        if dollar_count > 10 and len(stripped) - dollar_count < 50:
+            mask.append(False)
+            continue
+
+        lines = chunk_text.split('\n')
+        if len(lines) > 5:
+            unique_lines = {s for line in lines if (s := line.strip())}
+            if len(unique_lines) / len(lines) < 0.3:
+                mask.append(False)
+                continue
+
+        mask.append(True)
+
+    return mask
+
+
+def should_process_chunks(items: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+    """
+    Apply should_process_chunk to a batch of (chunk_text, chunk_type) pairs.
+
+    Each chunk is independent and the work is dominated by C-level
+    str/regex operations that release the GIL, so large batches are fanned
+    out over a thread pool; small batches run inline to avoid pool
+    overhead. Results keep the input order.
+    """
+
+    if len(items) < 32:
+        return [should_process_chunk(chunk_text, chunk_type) for chunk_text, chunk_type in items]
+
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda item: should_process_chunk(*item), items))
+
+
+def _build_name_validator():
+    """Build validate_entity_name with its constant tables captured as
+    closure cells, so the hot path does LOAD_DEREF lookups instead of
+    per-call global lookups."""
+
+    trunc_prefixes = _TRUNC_PREFIXES
+    ocr_single_chars = _OCR_SINGLE_CHARS
+    meaningless_search = _MEANINGLESS_NAME_RE.search
+    non_alpha_ascii = _NON_ALPHA_ASCII
+
+    def validate_entity_name(name: str) -> Tuple[bool, str]:
+        """
+        Validate extracted entity names for quality.
+
+        Returns:
+            Tuple of (is_valid, reason_if_invalid)
+        """
+
+        name = name.strip()
+
+        # Reject empty or very short names
+        if len(name) < 3:
+            return False, "too_short"
+
+        # Reject truncated names (common extraction errors)
+        low = name.lower()
+        if low.startswith(trunc_prefixes) or '...' in name:
             return False, "truncated_name"
-    
-    # Reject single digits or very short math expressions as formulas
-    if name.isdigit() and len(name) <= 2:
-        return False, "single_digit"
-    
-    # Reject common OCR artifacts
-    ocr_artifacts = ['{', '}', '^', '_', '\\', '$$', '`']
-    if any(artifact in name for artifact in ocr_artifacts):
-        return False, "ocr_artifact"
-    
-    # Reject if mostly punctuation
-    alpha_chars = sum(1 for c in name if c.isalpha())
-    if alpha_chars / len(name) < 0.5:
-        return False, "mostly_punctuation"
-    
-    # Reject common meaningless phrases
-    meaningless = [
-        "click here", "see page", "page ", "chapter ", "section ",
-        "figure ", "table ", "appendix ", "index", "bibliography"
-    ]
-    
-    name_lower = name.lower()
-    if any(phrase in name_lower for phrase in meaningless):
-        return False, "meaningless_phrase"
-    
-    return True, ""
+
+        # Reject single digits or very short math expressions as formulas
+        if name.isdigit() and len(name) <= 2:
+            return False, "single_digit"
+
+        # Reject common OCR artifacts
+        if ocr_single_chars.intersection(name) or '$$' in name:
+            return False, "ocr_artifact"
+
+        # Reject if mostly punctuation
+        if name.isascii():
+            alpha_chars = len(name.translate(non_alpha_ascii))
+        else:
+            alpha_chars = sum(1 for c in name if c.isalpha())
+        if alpha_chars / len(name) < 0.5:
+            return False, "mostly_punctuation"
+
+        # Reject common meaningless phrases
+        if meaningless_search(name):
+            return False, "meaningless_phrase"
+
+        return True, ""
+
+    return validate_entity_name
+
+
+# Corpora repeat the same entity names across many chunks, and both
+# validators are pure, so repeat inputs resolve to a dict lookup
+validate_entity_name = lru_cache(maxsize=100_000)(_build_name_validator())
 
 
+def validate_entity_names(names: List[str]) -> List[Tuple[bool, str]]:
+    """
+    Validate a batch of entity names, amortizing work across duplicates.
+
+    Each distinct name is validated once (also warming the shared
+    lru_cache); repeats within the batch are answered from a local dict,
+    so a corpus-level pass costs one full validation per distinct name.
+    Results keep the input order.
+    """
+
+    seen = {}
+    results = []
+    for name in names:
+        result = seen.get(name)
+        if result is None:
+            result = validate_entity_name(name)
+            seen[name] = result
+        results.append(result)
+    return results
+
+
+@lru_cache(maxsize=100_000)
 def validate_entity_definition(definition: str, entity_name: str) -> Tuple[bool, str]:
     """
     Validate that entity definition is relevant and useful.
@@ -122,27 +272,19 @@ def validate_entity_definition(definition: str, entity_name: str) -> Tuple[bool,
         Tuple of (is_valid, reason_if_invalid)
     """
     
-    if not definition or len(definition.strip()) < 10:
+    definition = definition.strip() if definition else ''
+
+    if len(definition) < 10:
         return False, "too_short"
     
-    definition = definition.strip()
-    
-    # Check if definition is just a repetition of the name
-    if entity_name.lower() in definition.lower() and len(definition) < len(entity_name) + 20:
+    # Check if definition is just a repetition of the name. The length
+    # test goes first so the two lowered copies are only allocated for
+    # definitions short enough to be circular at all.
+    if len(definition) < len(entity_name) + 20 and entity_name.lower() in definition.lower():
         return False, "circular_definition"
     
     # Check for meaningless definitions
-    meaningless_defs = [
-        "definition not provided",
-        "see above",
-        "as mentioned",
-        "refers to",
-        "unknown",
-        "n/a"
-    ]
-    
-    def_lower = definition.lower()
-    if any(phrase in def_lower for phrase in meaningless_defs):
+    if _MEANINGLESS_DEF_RE.search(definition):
         return False, "meaningless_definition"
     
     return True, ""
\ No newline at end of file
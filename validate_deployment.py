@@ -3,15 +3,31 @@
 Validate LangGraph Cloud deployment readiness
 """
 
+import ast
 import sys
 import os
 import json
+from collections import defaultdict
 from pathlib import Path
 
+# Validation output is collected and written in one flush at the end,
+# instead of a write per message (stdout is often unbuffered in CI)
+_LINES = []
+
+
+def _log(message=""):
+    _LINES.append(str(message))
+
+
+def _flush_output():
+    sys.stdout.write('\n'.join(_LINES) + '\n')
+    sys.stdout.flush()
+    _LINES.clear()
+
 
 def validate_structure():
     """Validate directory structure"""
-    print("🔍 Validating project structure...")
+    _log("🔍 Validating project structure...")
     
     required_files = [
         'langgraph.json',
@@ -26,22 +42,31 @@ def validate_structure():
         '.github/workflows/deploy.yml'
     ]
     
-    missing_files = []
+    # Group by directory and scan each one once, instead of stat'ing
+    # every required file individually
+    by_dir = defaultdict(list)
     for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
-    
+        path = Path(file_path)
+        by_dir[str(path.parent)].append(path.name)
+
+    missing_files = []
+    for directory, names in by_dir.items():
+        present = {entry.name for entry in os.scandir(directory)} if os.path.isdir(directory) else set()
+        missing_files.extend(
+            str(Path(directory) / name) for name in names if name not in present
+        )
+
     if missing_files:
-        print(f"❌ Missing files: {missing_files}")
+        _log(f"❌ Missing files: {missing_files}")
         return False
     
-    print("✅ All required files present")
+    _log("✅ All required files present")
     return True
 
 
 def validate_langgraph_config():
     """Validate langgraph.json configuration"""
-    print("🔍 Validating langgraph.json...")
+    _log("🔍 Validating langgraph.json...")
     
     try:
         with open('langgraph.json', 'r') as f:
@@ -50,29 +75,29 @@ def validate_langgraph_config():
         required_keys = ['dependencies', 'graphs', 'env']
         for key in required_keys:
             if key not in config:
-                print(f"❌ Missing key in langgraph.json: {key}")
+                _log(f"❌ Missing key in langgraph.json: {key}")
                 return False
         
         if 'semantic_extraction' not in config['graphs']:
-            print("❌ Missing 'semantic_extraction' graph in langgraph.json")
+            _log("❌ Missing 'semantic_extraction' graph in langgraph.json")
             return False
         
         graph_path = config['graphs']['semantic_extraction']
         if not graph_path.endswith(':extraction_graph'):
-            print(f"❌ Incorrect graph export: {graph_path}")
+            _log(f"❌ Incorrect graph export: {graph_path}")
             return False
         
-        print("✅ langgraph.json configuration valid")
+        _log("✅ langgraph.json configuration valid")
         return True
         
     except Exception as e:
-        print(f"❌ Error validating langgraph.json: {e}")
+        _log(f"❌ Error validating langgraph.json: {e}")
         return False
 
 
 def validate_imports():
     """Test critical imports"""
-    print("🔍 Validating Python imports...")
+    _log("🔍 Validating Python imports...")
     
     try:
         # Test graph import
@@ -87,16 +112,16 @@ def validate_imports():
         except:
             # Alternative approach for compiled graphs
             nodes = ['retrieve_chunk', 'extract_entities', 'enhance_relationships', 'store_results']
-            print("✅ Graph compiled successfully (using expected nodes)")
+            _log("✅ Graph compiled successfully (using expected nodes)")
         
         expected_nodes = ['retrieve_chunk', 'extract_entities', 'enhance_relationships', 'store_results']
         
         for node in expected_nodes:
             if node not in nodes:
-                print(f"❌ Missing graph node: {node}")
+                _log(f"❌ Missing graph node: {node}")
                 return False
         
-        print(f"✅ Graph nodes validated: {nodes}")
+        _log(f"✅ Graph nodes validated: {nodes}")
         
         # Test schema imports
         from rag_extraction.schemas.state import ExtractionState
@@ -104,28 +129,57 @@ def validate_imports():
         
         # Test state creation
         state = ExtractionState(chunk_id='test')
-        print("✅ State model validated")
+        _log("✅ State model validated")
         
         # Test entity creation
         entity = ExtractedEntity(name='test', entity_type='concept')
-        print("✅ Entity models validated")
+        _log("✅ Entity models validated")
         
         # Test node imports
         from rag_extraction.nodes import retrieve_chunk, extract_entities, enhance_relationships, store_results
-        print("✅ Node imports validated")
+        _log("✅ Node imports validated")
         
         return True
         
     except Exception as e:
-        print(f"❌ Import validation failed: {e}")
+        _log(f"❌ Import validation failed: {e}")
         import traceback
         traceback.print_exc()
         return False
 
 
+def validate_imports_ast():
+    """Statically validate the graph module without importing it"""
+    _log("🔍 Validating graph module (AST only)...")
+
+    try:
+        tree = ast.parse(Path('rag_extraction/graph.py').read_text())
+
+        function_names = {node.name for node in ast.walk(tree)
+                          if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+        assigned_names = {target.id for node in ast.walk(tree)
+                          if isinstance(node, ast.Assign)
+                          for target in node.targets if isinstance(target, ast.Name)}
+
+        if 'create_extraction_graph' not in function_names:
+            _log("❌ Missing create_extraction_graph in rag_extraction/graph.py")
+            return False
+
+        if 'extraction_graph' not in assigned_names:
+            _log("❌ Missing extraction_graph export in rag_extraction/graph.py")
+            return False
+
+        _log("✅ Graph module structure validated (imports not executed)")
+        return True
+
+    except Exception as e:
+        _log(f"❌ AST validation failed: {e}")
+        return False
+
+
 def validate_dependencies():
     """Validate requirements.txt"""
-    print("🔍 Validating dependencies...")
+    _log("🔍 Validating dependencies...")
     
     try:
         with open('requirements.txt', 'r') as f:
@@ -135,50 +189,57 @@ def validate_dependencies():
         
         for dep in core_deps:
             if not any(dep in req for req in requirements):
-                print(f"❌ Missing dependency: {dep}")
+                _log(f"❌ Missing dependency: {dep}")
                 return False
         
-        print("✅ Core dependencies present")
+        _log("✅ Core dependencies present")
         return True
         
     except Exception as e:
-        print(f"❌ Error validating dependencies: {e}")
+        _log(f"❌ Error validating dependencies: {e}")
         return False
 
 
 def main():
     """Run all validations"""
-    print("🚀 LangGraph Cloud Deployment Validation")
-    print("=" * 50)
+    _log("🚀 LangGraph Cloud Deployment Validation")
+    _log("=" * 50)
     
+    # --ast-only swaps the import check for a static AST pass, skipping
+    # the heavyweight langgraph/openai/neo4j imports (fast CI checks)
+    ast_only = '--ast-only' in sys.argv
+
     validations = [
         validate_structure,
         validate_langgraph_config,
         validate_dependencies,
-        validate_imports
+        validate_imports_ast if ast_only else validate_imports
     ]
     
     all_passed = True
     for validation in validations:
         if not validation():
             all_passed = False
-        print()
+        _log()
     
     if all_passed:
-        print("🎉 All validations passed!")
-        print("✅ Ready for LangGraph Cloud deployment")
-        print()
-        print("📋 Next Steps:")
-        print("1. Go to https://smith.langchain.com")
-        print("2. Navigate to LangGraph Platform → '+ New Deployment'")
-        print("3. Select repository: https://github.com/joeott/rag-extraction-langgraph")
-        print("4. Configure environment variables")
-        print("5. Deploy to cloud")
+        _log("🎉 All validations passed!")
+        _log("✅ Ready for LangGraph Cloud deployment")
+        _log()
+        _log("📋 Next Steps:")
+        _log("1. Go to https://smith.langchain.com")
+        _log("2. Navigate to LangGraph Platform → '+ New Deployment'")
+        _log("3. Select repository: https://github.com/joeott/rag-extraction-langgraph")
+        _log("4. Configure environment variables")
+        _log("5. Deploy to cloud")
     else:
-        print("❌ Validation failed!")
-        print("Please fix the issues above before deploying")
+        _log("❌ Validation failed!")
+        _log("Please fix the issues above before deploying")
+        _flush_output()
         sys.exit(1)
 
+    _flush_output()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file